@@ -0,0 +1,118 @@
+import os
+
+from cachetools import LRUCache, TTLCache
+from sqlalchemy import ARRAY, Integer, any_, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.models import ClinicalTrial
+
+# The caches live in process memory and writes only invalidate the process that served them,
+# so they are only correct while a single API process serves the database. Set LOCAL_CACHE=off
+# when running more than one (several uvicorn workers or fastapi replicas).
+CACHE_ENABLED = os.getenv("LOCAL_CACHE", "on").lower() != "off"
+
+# Per-process cache of read-mostly trial rows, keyed by ID
+_trial_cache = LRUCache(maxsize=1024)
+# Rendered list pages keyed by their query parameters, kept for at most a minute
+_page_cache = TTLCache(maxsize=256, ttl=60)
+# Bumped by every invalidation. A reader takes it before querying and only caches its result if it is
+# unchanged afterwards, so a row read before a concurrent write commits is never stored after its eviction.
+_generation = 0
+
+
+def cache_generation() -> int:
+    """ Return the current invalidation generation, to be read before querying """
+
+    return _generation
+
+
+async def fetch_trial(db: AsyncSession, id: int) -> schemas.ClinicalTrial | None:
+    """
+    Retrieve a single trial by its ID, serving repeated lookups from the cache.
+
+    Cached entries are Pydantic models rather than ORM instances, so they stay
+    valid after the session that loaded them is closed. They are built with
+    model_construct: rows coming from the database need no re-validation.
+
+    Args:
+        db (AsyncSession): Database session.
+        id (int): Trial ID.
+
+    Returns:
+        ClinicalTrial | None: The trial, or None if it does not exist.
+    """
+    cached = _trial_cache.get(id) if CACHE_ENABLED else None
+    if cached is not None:
+        return cached
+
+    generation = _generation
+    stmt = select(*ClinicalTrial.__table__.c).where(ClinicalTrial.id == id)
+    row = (await db.execute(stmt)).mappings().one_or_none()
+    if row is None:
+        return None
+
+    trial = schemas.ClinicalTrial.model_construct(**row)
+    if CACHE_ENABLED and generation == _generation:
+        _trial_cache[id] = trial
+    return trial
+
+
+async def fetch_trials(db: AsyncSession, ids: list[int]) -> list[schemas.ClinicalTrial | None]:
+    """
+    Retrieve several trials at once, loading every uncached ID in a single query.
+
+    Args:
+        db (AsyncSession): Database session.
+        ids (list[int]): Trial IDs, in the order the results should follow.
+
+    Returns:
+        list[ClinicalTrial | None]: One entry per requested ID, None where the trial does not exist.
+    """
+    found = {id: _trial_cache[id] for id in ids if id in _trial_cache} if CACHE_ENABLED else {}
+    missing = set(ids) - found.keys()
+    generation = _generation
+    if missing:
+        # One array parameter (id = ANY($1)) instead of one bound parameter per ID
+        stmt = select(*ClinicalTrial.__table__.c).where(
+            ClinicalTrial.id == any_(bindparam("ids", list(missing), type_=ARRAY(Integer)))
+        )
+        for row in (await db.execute(stmt)).mappings():
+            found[row["id"]] = schemas.ClinicalTrial.model_construct(**row)
+            if CACHE_ENABLED and generation == _generation:
+                _trial_cache[row["id"]] = found[row["id"]]
+
+    return [found.get(id) for id in ids]
+
+
+def get_cached_page(key: tuple) -> tuple[bytes, str] | None:
+    """ Return the cached (body, etag) pair of a list page, if any """
+
+    return _page_cache.get(key) if CACHE_ENABLED else None
+
+
+def cache_page(key: tuple, body: bytes, etag: str, generation: int) -> None:
+    """
+    Store a rendered list page together with its ETag.
+
+    The page is dropped if a write invalidated the cache since `generation`
+    was read, as it may then reflect the data from before that write.
+    """
+    if CACHE_ENABLED and generation == _generation:
+        _page_cache[key] = (body, etag)
+
+
+def invalidate_cache(id: int | None = None) -> None:
+    """
+    Drop cached data after a write.
+
+    List pages are always cleared since any insert, update or delete can change them.
+
+    Args:
+        id (int, optional): ID of the modified trial, if any.
+    """
+    global _generation
+    _generation += 1
+    if id is not None:
+        _trial_cache.pop(id, None)
+    _page_cache.clear()
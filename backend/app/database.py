@@ -1,23 +1,81 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from uuid import uuid4
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
-from fastapi import Depends
 
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
-SessionLocal  = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Each pooled connection keeps its statements prepared, so repeated queries skip parse/plan
+connect_args = {"prepared_statement_cache_size": int(os.getenv("ASYNCPG_STATEMENT_CACHE_SIZE", 500))}
+
+if os.getenv("DB_PGBOUNCER"):
+    # PgBouncer in transaction mode may run consecutive statements on different server connections,
+    # so prepared statements cannot be cached and their names must never collide
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+# Pool sizes can be tuned per deployment (SQLALCHEMY_POOL_SIZE / SQLALCHEMY_MAX_OVERFLOW)
+engine = create_async_engine(
+    DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
+    pool_size=int(os.getenv("SQLALCHEMY_POOL_SIZE", 20)),
+    max_overflow=int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", 10)),
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    echo=False,
+    connect_args=connect_args,
+)
+AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 Base = declarative_base()
 
-def get_db():
-    """ Automatically open and close the DB session """
-    
-    db = SessionLocal()
+# Statements executed by the current request, only tracked in development (ENV=dev)
+_query_count: ContextVar[list[int] | None] = ContextVar("query_count", default=None)
+
+if os.getenv("ENV") == "dev":
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_count.get()
+        if counter is not None:
+            counter[0] += 1
+
+@contextmanager
+def count_queries():
+    """ Count the SQL statements executed inside the block, exposed as counter[0] """
+
+    counter = [0]
+    token = _query_count.set(counter)
     try:
-        yield db
+        yield counter
     finally:
-        db.close()
\ No newline at end of file
+        _query_count.reset(token)
+
+# Session of the request being served, bound by the db_session middleware
+_db_session: ContextVar[AsyncSession] = ContextVar("db_session")
+
+@asynccontextmanager
+async def request_session():
+    """ Automatically open and close the DB session of a request.
+
+    Closing the session returns its connection to the engine pool,
+    so the next request reuses it instead of opening a new TCP connection.
+    """
+
+    async with AsyncSessionLocal() as db:
+        token = _db_session.set(db)
+        try:
+            yield db
+        finally:
+            _db_session.reset(token)
+
+def get_session() -> AsyncSession:
+    """ Return the DB session bound to the current request """
+
+    return _db_session.get()
@@ -1,60 +1,216 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
+import hashlib
+import logging
+import orjson
+import os
+from contextlib import asynccontextmanager
+from fastapi import Body, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import delete, insert, lambda_stmt, select, update
+from sqlalchemy.sql.lambdas import StatementLambdaElement
 from typing import List
 
-from app import schemas
+from app import crud, schemas
 from app.models import Base, ClinicalTrial
-from app.database import get_db, engine
+from app.database import AsyncSessionLocal, count_queries, engine, get_session, request_session
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """ Release pooled connections on shutdown; the schema itself is managed by Alembic """
+
+    if os.getenv("TESTING"):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    yield
+    await engine.dispose()
 
 app = FastAPI(
     title="Clinical Trials Explorer API",
     description="A FastAPI-based service to manage and explore EU clinical trial data.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
-Base.metadata.create_all(bind=engine)
 
+logger = logging.getLogger(__name__)
+
+if os.getenv("ENV") == "dev":
+    # Surface N+1 query patterns (e.g. lazy-loaded relationships in list endpoints) during development
+    QUERY_LIMIT = int(os.getenv("NPLUSONE_QUERY_LIMIT", 10))
+    RAISE_ON_NPLUSONE = os.getenv("NPLUSONE_RAISE", "").lower() in ("1", "true")
+
+    @app.middleware("http")
+    async def detect_n_plus_one(request: Request, call_next):
+        """ Warn about (or fail) requests that execute more SQL statements than expected """
+
+        with count_queries() as counter:
+            response = await call_next(request)
+
+        if counter[0] > QUERY_LIMIT:
+            message = f"{request.method} {request.url.path} executed {counter[0]} SQL statements (limit {QUERY_LIMIT})"
+            if RAISE_ON_NPLUSONE:
+                raise RuntimeError(message)
+            logger.warning(message)
+
+        return response
+
+@app.middleware("http")
+async def db_session(request: Request, call_next):
+    """ Open one database session per request and close it once the response is produced """
+
+    async with request_session():
+        return await call_next(request)
+
+def make_etag(body: bytes) -> str:
+    """ Build a weak ETag from a rendered response body """
+
+    return f'W/"{hashlib.md5(body).hexdigest()}"'
+
+def etag_response(request: Request, body: bytes, etag: str) -> Response:
+    """
+    Serve a rendered JSON body with its ETag.
+
+    Clients are asked to revalidate on every use, and get an empty 304 when
+    the ETag they send in If-None-Match still matches.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def filter_trials(stmt: StatementLambdaElement, disease_area: str, status: str, country: str) -> StatementLambdaElement:
+    """
+    Add the optional list filters to a lambda statement.
+
+    Each filter is its own lambda, so SQLAlchemy caches one compiled form
+    per combination of filters and only binds the values on later calls.
+    """
+    if disease_area:
+        stmt += lambda s: s.where(ClinicalTrial.disease_area == disease_area)
+    if status:
+        stmt += lambda s: s.where(ClinicalTrial.status == status)
+    if country:
+        stmt += lambda s: s.where(ClinicalTrial.country == country)
+
+    return stmt
 
-@app.get("/trials", tags=["Trials"])
-def get_trials(
+# Upper bound on the page size accepted by GET /trials
+MAX_PAGE_SIZE = 100
+
+@app.get("/trials", response_model=schemas.TrialListResponse, tags=["Trials"])
+async def get_trials(
+    request: Request,
     disease_area: str = None,
     status: str = None,
     country: str = None,
-    limit: int = 10,
-    offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: int | None = Query(None, ge=0),
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
 ):
     """
-    Retrieve clinical trials with optional filtering and pagination.
+    Retrieve clinical trials with optional filtering and keyset pagination.
 
     Args:
         disease_area (str, optional): Filter by disease area.
         status (str, optional): Filter by trial status.
         country (str, optional): Filter by country of origin.
-        limit (int, optional): Maximum number of results to return (default: 10).
-        offset (int, optional): Number of records to skip before starting to return results (default: 0).
-        db (Session): SQLAlchemy database session.
+        cursor (int, optional): `next_cursor` of the previous page; omit it to get the first page.
+        limit (int, optional): Maximum number of results to return (default: 10, at most MAX_PAGE_SIZE).
+        request (Request): Incoming request, used for If-None-Match revalidation.
 
     Returns:
-        List[ClinicalTrial]: A list of clinical trials matching the filters and pagination.
+        TrialListResponse: The page of matching trials ordered by ID, and the cursor of the next page (null on the last one).
     """
-    query = db.query(ClinicalTrial)
+    db = get_session()
+    cache_key = (disease_area, status, country, cursor, limit)
+    cached = crud.get_cached_page(cache_key)
+    if cached is not None:
+        return etag_response(request, *cached)
+    generation = crud.cache_generation()
 
-    if disease_area:
-        query = query.filter(ClinicalTrial.disease_area == disease_area)
-    if status:
-        query = query.filter(ClinicalTrial.status == status)
-    if country:
-        query = query.filter(ClinicalTrial.country == country)
+    # Seeking past the cursor on the primary key costs the same at any depth, unlike OFFSET
+    stmt = lambda_stmt(lambda: select(*ClinicalTrial.__table__.c).order_by(ClinicalTrial.id))
+    stmt = filter_trials(stmt, disease_area, status, country)
+    if cursor is not None:
+        stmt += lambda s: s.where(ClinicalTrial.id > cursor)
+    # One extra row tells whether another page follows
+    page_size = limit + 1
+    stmt += lambda s: s.limit(page_size)
 
-    total_count = query.count()
-    results = query.offset(offset).limit(limit).all()
+    rows = (await db.execute(stmt)).all()
+    results = [row._asdict() for row in rows[:limit]]
+    next_cursor = results[-1]["id"] if len(rows) > limit else None
 
-    return {
-        "total": total_count,
+    # orjson serializes the row dicts (including their dates) directly
+    body = orjson.dumps({
         "limit": limit,
-        "offset": offset,
+        "next_cursor": next_cursor,
         "data": results
-    }
+    })
+    etag = make_etag(body)
+    crud.cache_page(cache_key, body, etag, generation)
+
+    return etag_response(request, body, etag)
+
+# Upper bound on the items accepted by POST /trials/batch and POST /trials/bulk
+MAX_BATCH_SIZE = 1000
+
+@app.post(
+    "/trials/batch",
+    response_model=List[schemas.ClinicalTrial | None],
+    tags=["Trials"],
+    summary="Retrieve several clinical trials",
+    description="Retrieve multiple clinical trial records identified by their IDs in a single request."
+)
+async def get_trials_batch(ids: List[int] = Body(max_length=MAX_BATCH_SIZE)):
+    """
+    Retrieve several clinical trials by their IDs with one database round-trip.
+
+    Args:
+        ids (List[int]): IDs of the trials wanted (at most MAX_BATCH_SIZE).
+
+    Returns:
+        List[ClinicalTrial | None]: The trials in request order, null for unknown IDs.
+    """
+    db = get_session()
+    trials = await crud.fetch_trials(db, ids)
+
+    # Returning the response directly skips re-validating rows that came from the database
+    return ORJSONResponse([trial.model_dump() if trial is not None else None for trial in trials])
+
+@app.get(
+    "/trials/export",
+    tags=["Trials"],
+    summary="Export clinical trials",
+    description="Streams every clinical trial matching the optional filters as newline-delimited JSON."
+)
+async def export_trials(disease_area: str = None, status: str = None, country: str = None):
+    """
+    Stream clinical trials as NDJSON, one trial per line.
+
+    Rows are read through a server-side cursor in batches of 500, so memory use
+    stays flat and the first lines are sent before the whole query has finished.
+
+    Args:
+        disease_area (str, optional): Filter by disease area.
+        status (str, optional): Filter by trial status.
+        country (str, optional): Filter by country of origin.
+
+    Returns:
+        StreamingResponse: The matching trials as application/x-ndjson.
+    """
+    stmt = lambda_stmt(lambda: select(*ClinicalTrial.__table__.c).order_by(ClinicalTrial.id))
+    stmt = filter_trials(stmt, disease_area, status, country)
+
+    async def generate_lines():
+        # The body is streamed after the request session is closed, so the export uses its own
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(stmt, execution_options={"yield_per": 500})
+            async for partition in result.partitions():
+                for row in partition:
+                    yield orjson.dumps(row._asdict()) + b"\n"
+
+    return StreamingResponse(generate_lines(), media_type="application/x-ndjson")
 
 @app.get(
     "/trials/{id}",
@@ -63,23 +219,25 @@ def get_trials(
     summary="Retrieve a single clinical trial",
     description=" Retrieve a single clinical trial record in the database identified by its ID."
 )
-def get_trial(id: int, db: Session = Depends(get_db)):
+async def get_trial(id: int, request: Request):
     """
     Retrieve a single clinical trial from the database by its ID.
 
     Args:
         id (int): ID from the trial wanted.
-        db (Session): Database session (injected via dependency).
+        request (Request): Incoming request, used for If-None-Match revalidation.
 
     Returns:
         ClinicalTrial: The retrieved trial.
     """
-    
-    existing_trial = db.query(ClinicalTrial).filter(ClinicalTrial.id == id).first()
+    db = get_session()
+
+    existing_trial = await crud.fetch_trial(db, id)
     if existing_trial is None:
         raise HTTPException(status_code=404, detail="Trial not found")
     
-    return existing_trial
+    body = existing_trial.model_dump_json().encode()
+    return etag_response(request, body, make_etag(body))
 
 @app.post(
     "/trials",
@@ -88,25 +246,54 @@ def get_trial(id: int, db: Session = Depends(get_db)):
     summary="Create a new trial",
     description="Creates a new clinical trial record in the database using provided trial data."
 )
-def create_trial(trial: schemas.ClinicalTrialCreate, db: Session = Depends(get_db)):
+async def create_trial(trial: schemas.ClinicalTrialCreate):
     """
     Create a new clinical trial record in the database.
 
     Args:
         trial (ClinicalTrialCreate): Incoming validated request data.
-        db (Session): Database session (injected via dependency).
 
     Returns:
         ClinicalTrial: The created trial, including its generated ID.
     """
-    
+    db = get_session()
+
     db_trial = ClinicalTrial(**trial.model_dump())
     db.add(db_trial)
-    db.commit()
-    db.refresh(db_trial)
+    await db.commit()
+    crud.invalidate_cache()
+    await db.refresh(db_trial)
     
     return db_trial
 
+@app.post(
+    "/trials/bulk",
+    response_model=schemas.BulkCreateResponse,
+    tags=["Trials"],
+    summary="Create several trials",
+    description="Creates multiple clinical trial records in the database with a single batched insert."
+)
+async def create_trials_bulk(trials: List[schemas.ClinicalTrialCreate] = Body(max_length=MAX_BATCH_SIZE)):
+    """
+    Create several clinical trial records in one statement and one commit.
+
+    Args:
+        trials (List[ClinicalTrialCreate]): Incoming validated request data (at most MAX_BATCH_SIZE trials).
+
+    Returns:
+        dict: The generated IDs, in the same order as the submitted trials.
+    """
+    db = get_session()
+    if not trials:
+        return {"ids": []}
+
+    stmt = insert(ClinicalTrial).returning(ClinicalTrial.id, sort_by_parameter_order=True)
+    ids = (await db.scalars(stmt, [trial.model_dump() for trial in trials])).all()
+    await db.commit()
+    crud.invalidate_cache()
+
+    return {"ids": ids}
+
 @app.put(
     "/trials/{id}",
     response_model=schemas.ClinicalTrial,
@@ -114,27 +301,26 @@ def create_trial(trial: schemas.ClinicalTrialCreate, db: Session = Depends(get_d
     summary="Updates an existing trial",
     description="Updates an existing trial record in the database using provided trial data."
 )
-def update_trial(id: int, trial: schemas.ClinicalTrialCreate, db: Session = Depends(get_db)):
+async def update_trial(id: int, trial: schemas.ClinicalTrialCreate):
     """
     Update a clinical trial by its ID.
 
     Args:
         id (int): Trial ID.
         trial (ClinicalTrialCreate): New data to update with.
-        db (Session): DB session.
 
     Returns:
         ClinicalTrial: The updated trial.
     """
-    existing_trial = db.query(ClinicalTrial).filter(ClinicalTrial.id == id).first()
+    db = get_session()
+    # UPDATE ... RETURNING checks existence, writes and reads back the row in one round-trip
+    stmt = update(ClinicalTrial).where(ClinicalTrial.id == id).values(**trial.model_dump()).returning(ClinicalTrial)
+    existing_trial = (await db.execute(stmt)).scalar_one_or_none()
     if existing_trial is None:
         raise HTTPException(status_code=404, detail="Trial not found")
-    
-    for key, value in trial.model_dump().items():
-        setattr(existing_trial, key, value)
 
-    db.commit()
-    db.refresh(existing_trial)
+    await db.commit()
+    crud.invalidate_cache(id)
 
     return existing_trial
 
@@ -144,22 +330,22 @@ def update_trial(id: int, trial: schemas.ClinicalTrialCreate, db: Session = Depe
     summary="Deletes an existing trial",
     description="Deletes an existing trial record in the database identified by its ID."
 )
-def delete_trial(id: int, db: Session = Depends(get_db)):
+async def delete_trial(id: int):
     """
     Delete a clinical trial by its ID.
 
     Args:
         id (int): Trial ID.
-        db (Session): DB session.
 
     Returns:
         dict: Success message.
     """
-    existing_trial = db.query(ClinicalTrial).filter(ClinicalTrial.id == id).first()
-    if existing_trial is None:
+    db = get_session()
+    deleted_id = (await db.execute(delete(ClinicalTrial).where(ClinicalTrial.id == id).returning(ClinicalTrial.id))).scalar_one_or_none()
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Trial not found")
 
-    db.delete(existing_trial)
-    db.commit()
+    await db.commit()
+    crud.invalidate_cache(id)
 
     return {"message": "Trial deleted"}
@@ -1,8 +1,13 @@
-from sqlalchemy import Column, Integer, String, Date, Text
+from sqlalchemy import Column, Integer, String, Date, Text, Index
 from app.database import Base
 
 class ClinicalTrial(Base):
     __tablename__ = "clinical_trials"
+    __table_args__ = (
+        Index("ix_trials_filter", "disease_area", "status", "country"),
+        Index("ix_trials_status", "status"),
+        Index("ix_trials_country", "country"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     official_title = Column(String, nullable=False)
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 
 class ClinicalTrialBase(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     # id will be added in the response schema
     official_title: str
     acronym: str | None = None
@@ -21,9 +23,17 @@ class ClinicalTrialCreate(ClinicalTrialBase):
 class ClinicalTrial(ClinicalTrialBase):
     """Used for GET requests"""
     id: int
-    
-    class Config:
-        from_attributes = True
+
+    model_config = ConfigDict(from_attributes=True)
+
+class TrialListResponse(BaseModel):
+    """Used for paginated GET /trials responses"""
+    limit: int
+    next_cursor: int | None
+    data: list[ClinicalTrial]
         
 class DeleteResponse(BaseModel):
-    message: str
\ No newline at end of file
+    message: str
+
+class BulkCreateResponse(BaseModel):
+    ids: list[int]
\ No newline at end of file
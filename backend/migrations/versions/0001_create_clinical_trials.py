@@ -0,0 +1,47 @@
+"""create clinical_trials table
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-05-23 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "clinical_trials",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("official_title", sa.String(), nullable=False),
+        sa.Column("acronym", sa.String(), nullable=True),
+        sa.Column("disease_area", sa.String(), nullable=False),
+        sa.Column("trial_phase", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("start_date", sa.Date(), nullable=False),
+        sa.Column("end_date", sa.Date(), nullable=False),
+        sa.Column("country", sa.String(), nullable=False),
+        sa.Column("sponsor", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_clinical_trials_id", "clinical_trials", ["id"], unique=False, if_not_exists=True)
+    op.create_index("ix_trials_filter", "clinical_trials", ["disease_area", "status", "country"], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_trials_filter", table_name="clinical_trials")
+    op.drop_index("ix_clinical_trials_id", table_name="clinical_trials")
+    op.drop_table("clinical_trials")
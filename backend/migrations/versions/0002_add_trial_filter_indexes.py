@@ -0,0 +1,30 @@
+"""add status and country indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-05-23 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_trials_status", "clinical_trials", ["status"], unique=False)
+    op.create_index("ix_trials_country", "clinical_trials", ["country"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_trials_country", table_name="clinical_trials")
+    op.drop_index("ix_trials_status", table_name="clinical_trials")
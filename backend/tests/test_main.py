@@ -1,3 +1,4 @@
+import json
 import requests
 
 BASE_URL = "http://127.0.0.1:62119"  # Replace if `minikube service fastapi --url` changes
@@ -66,3 +67,143 @@ def test_post_get_delete_trial():
 
     confirm_response = requests.get(f"{BASE_URL}/trials/{trial_id}")
     assert confirm_response.status_code == 404
+
+def test_get_trials_not_modified():
+    response = requests.get(f"{BASE_URL}/trials")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    cached_response = requests.get(f"{BASE_URL}/trials", headers={"If-None-Match": etag})
+    assert cached_response.status_code == 304
+
+def test_get_trials_batch():
+    payload = {
+        "official_title": "A Study on Renal Function",
+        "acronym": "RENAL",
+        "disease_area": "Nephrology",
+        "trial_phase": "Phase I",
+        "status": "Recruiting",
+        "start_date": "2025-03-01",
+        "end_date": "2025-09-30",
+        "country": "Spain",
+        "sponsor": "Hospital Clínic",
+        "description": "Assessing kidney function markers."
+    }
+
+    trial_id = requests.post(f"{BASE_URL}/trials", json=payload).json()["id"]
+
+    response = requests.post(f"{BASE_URL}/trials/batch", json=[trial_id, 999999])
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["id"] == trial_id
+    assert results[1] is None
+
+    requests.delete(f"{BASE_URL}/trials/{trial_id}")
+
+def test_post_bulk_trials():
+    payload = [
+        {
+            "official_title": f"A Study on Sleep Quality {i}",
+            "acronym": f"SLEEP-{i}",
+            "disease_area": "Neurology",
+            "trial_phase": "Phase II",
+            "status": "Ongoing",
+            "start_date": "2025-04-01",
+            "end_date": "2026-04-01",
+            "country": "Italy",
+            "sponsor": "Università di Bologna",
+            "description": "Measuring sleep quality under a new treatment."
+        }
+        for i in range(3)
+    ]
+
+    response = requests.post(f"{BASE_URL}/trials/bulk", json=payload)
+    assert response.status_code == 200
+    ids = response.json()["ids"]
+    assert len(ids) == 3
+
+    for i, trial_id in enumerate(ids):
+        get_response = requests.get(f"{BASE_URL}/trials/{trial_id}")
+        assert get_response.json()["acronym"] == f"SLEEP-{i}"
+        requests.delete(f"{BASE_URL}/trials/{trial_id}")
+
+def test_export_trials():
+    payload = {
+        "official_title": "A Study on Bone Density",
+        "acronym": "BONE",
+        "disease_area": "Export Rheumatology",
+        "trial_phase": "Phase II",
+        "status": "Ongoing",
+        "start_date": "2025-05-01",
+        "end_date": "2026-05-01",
+        "country": "Portugal",
+        "sponsor": "Universidade de Lisboa",
+        "description": "Tracking bone density under a new therapy."
+    }
+
+    trial_id = requests.post(f"{BASE_URL}/trials", json=payload).json()["id"]
+
+    response = requests.get(
+        f"{BASE_URL}/trials/export", params={"disease_area": "Export Rheumatology"}, stream=True
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    exported_ids = [json.loads(line)["id"] for line in response.iter_lines()]
+    assert trial_id in exported_ids
+
+    requests.delete(f"{BASE_URL}/trials/{trial_id}")
+
+def test_get_trials_cursor_pagination():
+    payload = {
+        "official_title": "A Study on Allergy Response",
+        "acronym": "ALLERGY",
+        "disease_area": "Cursor Immunology",
+        "trial_phase": "Phase I",
+        "status": "Recruiting",
+        "start_date": "2025-06-01",
+        "end_date": "2025-12-01",
+        "country": "Austria",
+        "sponsor": "Medizinische Universität Wien",
+        "description": "Measuring allergic response to a new compound."
+    }
+
+    trial_ids = [requests.post(f"{BASE_URL}/trials", json=payload).json()["id"] for _ in range(2)]
+    params = {"disease_area": "Cursor Immunology", "limit": 1}
+
+    first_page = requests.get(f"{BASE_URL}/trials", params=params).json()
+    assert [trial["id"] for trial in first_page["data"]] == [trial_ids[0]]
+    assert first_page["next_cursor"] == trial_ids[0]
+
+    second_page = requests.get(f"{BASE_URL}/trials", params={**params, "cursor": first_page["next_cursor"]}).json()
+    assert [trial["id"] for trial in second_page["data"]] == [trial_ids[1]]
+    assert second_page["next_cursor"] is None
+
+    for trial_id in trial_ids:
+        requests.delete(f"{BASE_URL}/trials/{trial_id}")
+
+def test_get_trials_invalid_pagination():
+    assert requests.get(f"{BASE_URL}/trials", params={"limit": 0}).status_code == 422
+    assert requests.get(f"{BASE_URL}/trials", params={"limit": 1000}).status_code == 422
+    assert requests.get(f"{BASE_URL}/trials", params={"cursor": -1}).status_code == 422
+
+def test_get_trials_batch_too_many_ids():
+    response = requests.post(f"{BASE_URL}/trials/batch", json=list(range(1, 1002)))
+    assert response.status_code == 422
+
+def test_post_bulk_too_many_trials():
+    payload = [
+        {
+            "official_title": "A Study on Oversized Requests",
+            "disease_area": "Neurology",
+            "trial_phase": "Phase I",
+            "status": "Ongoing",
+            "start_date": "2025-01-01",
+            "end_date": "2025-12-31",
+            "country": "Germany",
+            "sponsor": "European Brain Institute"
+        }
+    ] * 1001
+
+    response = requests.post(f"{BASE_URL}/trials/bulk", json=payload)
+    assert response.status_code == 422